@@ -23,6 +23,10 @@ class UserFeedbackAdmin(admin.ModelAdmin):
     search_fields = ['comment']
     readonly_fields = ['created_at']
     date_hierarchy = 'created_at'
+    
+    def get_queryset(self, request):
+        # Join the prediction shown in list_display instead of one query per row
+        return super().get_queryset(request).select_related('prediction')
 
 @admin.register(ModelMetrics)
 class ModelMetricsAdmin(admin.ModelAdmin):
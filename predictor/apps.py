@@ -6,9 +6,7 @@ class PredictorConfig(AppConfig):
     verbose_name = 'Property Price Predictor'
     
     def ready(self):
-        # Load ML models when Django starts
-        try:
-            from .ml_utils import predictor
-            print("ML models loaded successfully")
-        except Exception as e:
-            print(f"Error loading ML models: {e}")
\ No newline at end of file
+        # Register signal handlers; ML models are loaded (and their kernels
+        # warmed up) lazily by ml_utils.get_predictor() in the worker that uses them
+        from . import signals
+
@@ -5,8 +5,8 @@ class Command(BaseCommand):
     help = 'Populate initial model metrics'
 
     def handle(self, *args, **kwargs):
-        # Create initial model metrics
-        ModelMetrics.objects.get_or_create(
+        # Create or refresh initial model metrics so re-runs pick up new values
+        ModelMetrics.objects.update_or_create(
             model_version='v1.0',
             defaults={
                 'mae': 15000000,
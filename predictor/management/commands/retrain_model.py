@@ -1,22 +1,83 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
 from predictor.models import ModelMetrics
-import subprocess
+import joblib
+import logging
 import os
+import runpy
+import subprocess
+import sys
+
+logger = logging.getLogger(__name__)
+
+TRAINING_SCRIPT = 'train_models.py'
 
 class Command(BaseCommand):
     help = 'Retrain the ML model with latest data'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subprocess',
+            action='store_true',
+            help='Run the training script in a separate Python process'
+        )
+
     def handle(self, *args, **kwargs):
         self.stdout.write('Starting model retraining...')
-        
-        # Run training script
-        result = subprocess.run(['python', 'train_model.py'], 
+
+        try:
+            if kwargs['subprocess']:
+                self.run_subprocess()
+            else:
+                self.run_in_process()
+        except Exception as e:
+            logger.exception("Model retraining failed")
+            self.stdout.write(self.style.ERROR(f'Training failed: {e}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Model retrained successfully'))
+
+        # Update database with the metrics saved alongside the new model
+        try:
+            self.save_metrics()
+        except Exception as e:
+            logger.exception("Saving model metrics failed")
+            self.stdout.write(self.style.ERROR(f'Saving model metrics failed: {e}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Model metrics saved'))
+
+    def save_metrics(self):
+        """Make the new model's metrics the only active ModelMetrics row"""
+        metrics = joblib.load(settings.ML_MODEL_DIR / 'model_stats.pkl')['metrics']
+        # Never leave the table without an active row if the insert fails
+        with transaction.atomic():
+            ModelMetrics.objects.filter(is_active=True).update(is_active=False)
+            ModelMetrics.objects.create(
+                model_version=metrics.get('version', timezone.now().strftime('v%Y%m%d%H%M')),
+                mae=metrics['mae'],
+                rmse=metrics['rmse'],
+                r2_score=metrics['r2_score'],
+                mape=metrics['mape'],
+                is_active=True,
+            )
+
+    def run_in_process(self):
+        """Run the training script in this interpreter, reusing loaded imports"""
+        # The script resolves its files relative to the project root
+        cwd = os.getcwd()
+        os.chdir(settings.BASE_DIR)
+        try:
+            runpy.run_path(TRAINING_SCRIPT, run_name='__main__')
+        finally:
+            os.chdir(cwd)
+
+    def run_subprocess(self):
+        """Run the training script in a fresh Python process"""
+        result = subprocess.run([sys.executable, TRAINING_SCRIPT],
+                                cwd=settings.BASE_DIR,
                                 capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            self.stdout.write(self.style.SUCCESS('Model retrained successfully'))
-            
-            # Update database with new metrics
-            # (Add logic to parse metrics and save to ModelMetrics)
-        else:
-            self.stdout.write(self.style.ERROR(f'Training failed: {result.stderr}'))
\ No newline at end of file
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:27
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_version', models.CharField(max_length=50)),
+                ('mae', models.FloatField(help_text='Mean Absolute Error')),
+                ('rmse', models.FloatField(help_text='Root Mean Squared Error')),
+                ('r2_score', models.FloatField(help_text='R² Score')),
+                ('mape', models.FloatField(help_text='Mean Absolute Percentage Error')),
+                ('training_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Model Metrics',
+                'ordering': ['-training_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PredictionRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('property_type', models.CharField(choices=[('Apartment', 'Apartment'), ('Townhouse', 'Townhouse'), ('Vacant Land', 'Vacant Land'), ('Commercial Property', 'Commercial Property'), ('Industrial Property', 'Industrial Property')], help_text='Type of property', max_length=50)),
+                ('location', models.CharField(choices=[('Karen', 'Karen'), ('Kilimani', 'Kilimani'), ('Kileleshwa', 'Kileleshwa'), ('Kitisuru', 'Kitisuru'), ('Lavington', 'Lavington'), ('Loresho', 'Loresho'), ('Muthaiga', 'Muthaiga'), ('Muthaiga North', 'Muthaiga North'), ('Nyari', 'Nyari'), ('Parklands', 'Parklands'), ('Riverside', 'Riverside'), ('Rosslyn', 'Rosslyn'), ('Runda', 'Runda'), ('Thigiri', 'Thigiri'), ('Westlands', 'Westlands'), ('Kyuna', 'Kyuna'), ('Kabete', 'Kabete'), ('Lower Kabete', 'Lower Kabete'), ('Kiambu Road', 'Kiambu Road'), ('Ongata Rongai', 'Ongata Rongai'), ('Ngong Rd', 'Ngong Rd'), ('Nairobi West', 'Nairobi West'), ('Syokimau', 'Syokimau'), ('Thome', 'Thome'), ('Waithaka', 'Waithaka'), ('Mombasa Rd', 'Mombasa Rd')], help_text='Property location in Nairobi', max_length=50)),
+                ('bedrooms', models.IntegerField(help_text='Number of bedrooms', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(20)])),
+                ('bathrooms', models.IntegerField(help_text='Number of bathrooms', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(20)])),
+                ('house_size', models.FloatField(blank=True, help_text='House size in square meters', null=True, validators=[django.core.validators.MinValueValidator(0)])),
+                ('land_size', models.FloatField(blank=True, help_text='Land size in square meters', null=True, validators=[django.core.validators.MinValueValidator(0)])),
+                ('predicted_price', models.DecimalField(blank=True, decimal_places=2, help_text='Predicted price in KSh', max_digits=15, null=True)),
+                ('confidence_score', models.FloatField(blank=True, help_text='Model confidence score (0-1)', null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(1)])),
+                ('price_range_min', models.DecimalField(blank=True, decimal_places=2, help_text='Minimum predicted price', max_digits=15, null=True)),
+                ('price_range_max', models.DecimalField(blank=True, decimal_places=2, help_text='Maximum predicted price', max_digits=15, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('session_id', models.CharField(blank=True, max_length=255, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='predictor_p_created_b8418e_idx'), models.Index(fields=['location'], name='predictor_p_locatio_11023f_idx'), models.Index(fields=['property_type'], name='predictor_p_propert_74be35_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserFeedback',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.IntegerField(help_text='Rating from 1-5 stars', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('comment', models.TextField(blank=True, help_text='Optional feedback comment')),
+                ('actual_price', models.DecimalField(blank=True, decimal_places=2, help_text='Actual price if known', max_digits=15, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('prediction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feedback', to='predictor.predictionrequest')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
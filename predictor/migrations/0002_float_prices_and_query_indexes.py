@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='predictionrequest',
+            name='predictor_p_locatio_11023f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='predictionrequest',
+            name='predictor_p_propert_74be35_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='predictionrequest',
+            new_name='recent_idx',
+            old_name='predictor_p_created_b8418e_idx',
+        ),
+        migrations.AlterField(
+            model_name='predictionrequest',
+            name='predicted_price',
+            field=models.FloatField(blank=True, help_text='Predicted price in KSh', null=True),
+        ),
+        migrations.AlterField(
+            model_name='predictionrequest',
+            name='price_range_max',
+            field=models.FloatField(blank=True, help_text='Maximum predicted price', null=True),
+        ),
+        migrations.AlterField(
+            model_name='predictionrequest',
+            name='price_range_min',
+            field=models.FloatField(blank=True, help_text='Minimum predicted price', null=True),
+        ),
+        migrations.AlterField(
+            model_name='userfeedback',
+            name='actual_price',
+            field=models.FloatField(blank=True, help_text='Actual price if known', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='predictionrequest',
+            index=models.Index(fields=['property_type', 'predicted_price'], name='pt_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='predictionrequest',
+            index=models.Index(fields=['location', 'predicted_price'], name='loc_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='predictionrequest',
+            index=models.Index(fields=['location', 'property_type', '-created_at'], name='pr_loc_ptype_created_idx'),
+        ),
+    ]
@@ -2,15 +2,80 @@
 ML utilities for property price prediction in Django
 """
 
+import hashlib
 import joblib
 import numpy as np
-import pandas as pd
+from numba import njit
+from functools import cached_property
 from pathlib import Path
 from django.conf import settings
+from django.core.cache import cache
+from .models import ModelMetrics
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+class PredictionError(ValueError):
+    """Raised when an input can't be encoded for the trained models"""
+
+# Serial on purpose: parallel=True needs a thread-safe numba threading layer
+# (TBB) to serve threaded servers, and the OpenMP layer breaks forked workers.
+# A forest walk for one request is microseconds, so threads wouldn't pay off.
+@njit(cache=True)
+def _forest_predict(X, roots, feature, threshold, left, right, leaf_value):
+    """
+    Walk every tree of the forest for every sample, returning (n_samples, n_trees) predictions.
+    Node arrays hold all trees back to back; roots[t] is the first node of tree t.
+    """
+    n_samples = X.shape[0]
+    n_trees = roots.shape[0]
+    out = np.empty((n_samples, n_trees), dtype=np.float64)
+    for i in range(n_samples):
+        for t in range(n_trees):
+            node = roots[t]
+            # Leaves have no children (sklearn marks them with -1)
+            while left[node] != -1:
+                if X[i, feature[node]] <= threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+            out[i, t] = leaf_value[node]
+    return out
+
+@njit(cache=True, fastmath=True)
+def _finalize(tree_preds, gb_pred, ridge_pred):
+    """
+    Combine per-tree RF, GB and Ridge predictions into the ensemble price,
+    confidence score and 95% interval for each row
+    """
+    n_samples = tree_preds.shape[0]
+    ensemble = np.empty(n_samples, dtype=np.float64)
+    confidence = np.empty(n_samples, dtype=np.float64)
+    price_min = np.empty(n_samples, dtype=np.float64)
+    price_max = np.empty(n_samples, dtype=np.float64)
+    for i in range(n_samples):
+        rf_mean = tree_preds[i].mean()
+        
+        # Weighted ensemble (RF: 50%, GB: 30%, Ridge: 20%)
+        ens = 0.5 * rf_mean + 0.3 * gb_pred[i] + 0.2 * ridge_pred[i]
+        
+        # Confidence score (inverse of coefficient of variation of rf, gb, ensemble)
+        mean_pred = (rf_mean + gb_pred[i] + ens) / 3
+        std_dev = np.sqrt(
+            ((rf_mean - mean_pred) ** 2 + (gb_pred[i] - mean_pred) ** 2 + (ens - mean_pred) ** 2) / 3
+        )
+        cv = std_dev / mean_pred if mean_pred > 0 else 1.0
+        
+        # 95% confidence interval from the spread of the RF trees
+        margin = 1.96 * tree_preds[i].std()
+        
+        ensemble[i] = ens
+        confidence[i] = max(0.0, min(1.0, 1 - cv))
+        price_min[i] = max(0.0, ens - margin)
+        price_max[i] = ens + margin
+    return ensemble, confidence, price_min, price_max
+
 class PropertyPricePredictor:
     """Wrapper class for ML model predictions"""
     
@@ -26,30 +91,163 @@ class PropertyPricePredictor:
     def load_models(self):
         """Load all trained models and encoders"""
         try:
+            # Loaded into memory rather than memory-mapped: retraining rewrites
+            # this file in place, and sklearn copies tree arrays out anyway
             self.models = joblib.load(self.model_dir / 'property_models.pkl')
             self.le_property = joblib.load(self.model_dir / 'property_type_encoder.pkl')
             self.le_location = joblib.load(self.model_dir / 'location_encoder.pkl')
             self.feature_names = joblib.load(self.model_dir / 'feature_names.pkl')
             self.stats = joblib.load(self.model_dir / 'model_stats.pkl')
+            # Identifies this training run, e.g. in prediction cache keys
+            self.model_hash = hashlib.blake2b(
+                (self.model_dir / 'model_stats.pkl').read_bytes(), digest_size=8
+            ).hexdigest()
+            self._build_lookups()
+            self._extract_forest()
+            
+            # Scaler and Ridge parameters for computing the Ridge leg without sklearn
+            scaler = self.models['scaler']
+            n_features = len(self.feature_names)
+            mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+            self._scaler_mean = mean.astype(np.float32)
+            self._scaler_invscale = (1.0 / scale).astype(np.float32)
+            self._ridge_w = self.models['ridge'].coef_.astype(np.float32)
+            self._ridge_b = float(self.models['ridge'].intercept_)
+            
+            # Static per loaded model; shared by every prediction result
+            self._feature_importance = {
+                name: float(importance)
+                for name, importance in zip(
+                    self.feature_names,
+                    self.models['rf'].feature_importances_
+                )
+            }
+            
+            self._warm_up()
             logger.info("ML models loaded successfully")
         except Exception as e:
             logger.error(f"Error loading models: {str(e)}")
             raise
     
+    @cached_property
+    def feature_importance(self):
+        """JSON-safe feature importance from model_stats.pkl. Treat as read-only."""
+        return {
+            name: float(value)
+            for name, value in self.stats.get('feature_importance', {}).items()
+        }
+    
+    @cached_property
+    def metrics(self):
+        """JSON-safe training metrics from model_stats.pkl. Treat as read-only."""
+        return {
+            key: value.item() if isinstance(value, np.generic) else value
+            for key, value in self.stats.get('metrics', {}).items()
+        }
+    
+    def _build_lookups(self):
+        """Precompute feature positions, label encodings and premiums used by prepare_input"""
+        self._feat_index = {name: i for i, name in enumerate(self.feature_names)}
+        self._property_codes = {cls: i for i, cls in enumerate(self.le_property.classes_)}
+        self._location_codes = {cls: i for i, cls in enumerate(self.le_location.classes_)}
+        
+        # Premium values from training stats
+        location_premium = self.stats.get('location_premium', {})
+        property_premium = self.stats.get('property_premium', {})
+        self._loc_premium = {loc: location_premium.get(loc, 0) for loc in self.le_location.classes_}
+        self._prop_premium = {prop: property_premium.get(prop, 0) for prop in self.le_property.classes_}
+    
+    def _extract_forest(self):
+        """Concatenate the RF tree structures into flat contiguous arrays for _forest_predict"""
+        trees = [est.tree_ for est in self.models['rf'].estimators_]
+        node_counts = [tree.node_count for tree in trees]
+        roots = np.cumsum([0] + node_counts[:-1]).astype(np.int32)
+        
+        # float32/int32 halves the bytes touched per node visited
+        feature = np.concatenate([tree.feature for tree in trees]).astype(np.int32)
+        threshold = np.concatenate(
+            [self._round_down_float32(tree.threshold) for tree in trees]
+        )
+        leaf_value = np.concatenate([tree.value[:, 0, 0] for tree in trees]).astype(np.float32)
+        
+        # Shift child indices by each tree's offset so they address the flat arrays
+        left = np.concatenate([
+            np.where(tree.children_left == -1, -1, tree.children_left + root)
+            for tree, root in zip(trees, roots)
+        ]).astype(np.int32)
+        right = np.concatenate([
+            np.where(tree.children_right == -1, -1, tree.children_right + root)
+            for tree, root in zip(trees, roots)
+        ]).astype(np.int32)
+        
+        self._forest = (roots, feature, threshold, left, right, leaf_value)
+    
+    @staticmethod
+    def _round_down_float32(values):
+        """
+        Cast float64 thresholds to float32 without changing any split:
+        for a float32 input x, x <= t exactly when x <= the largest float32 <= t
+        """
+        rounded = values.astype(np.float32)
+        over = rounded > values
+        rounded[over] = np.nextafter(rounded[over], np.float32(-np.inf))
+        return rounded
+    
+    def _warm_up(self):
+        """Run the numba kernels once on a dummy row so JIT compilation happens at load time"""
+        X = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+        # Goes through component_predict so the kernels see the real argument dtypes
+        _finalize(*self.component_predict(X))
+        # Build the cached JSON-safe stats now rather than on the first request
+        self.feature_importance
+        self.metrics
+    
+    def tree_predict(self, X):
+        """Get per-tree RF predictions, shape (n_samples, n_trees), for prepared rows"""
+        # sklearn trees compare float32 inputs against their thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return _forest_predict(X, *self._forest)
+    
     def engineer_features(self, data):
         """Engineer features for prediction"""
         # Calculate derived features
         data['bath_bed_ratio'] = data['bathroom'] / data['Bedroom']
         data['total_area'] = data.get('House size', 0) + data.get('Land size', 0)
         
-        # Get premium values from training stats
-        location_premiums = {loc: self.stats.get('location_premium', {}).get(loc, 0) 
-                            for loc in self.le_location.classes_}
-        property_premiums = {prop: self.stats.get('property_premium', {}).get(prop, 0) 
-                            for prop in self.le_property.classes_}
+        # Premium values precomputed from training stats
+        data['location_premium'] = self._loc_premium.get(data['Location'], 0)
+        data['property_premium'] = self._prop_premium.get(data['propertyType'], 0)
         
-        data['location_premium'] = location_premiums.get(data['Location'], 0)
-        data['property_premium'] = property_premiums.get(data['propertyType'], 0)
+        return data
+    
+    def _feature_row(self, property_data):
+        """Map a single input to engineered, encoded feature values"""
+        # Missing sizes (absent or None) fall back to the training medians
+        medians = self.stats['median_values']
+        house_size = property_data.get('house_size')
+        land_size = property_data.get('land_size')
+        
+        # Map input to feature format
+        data = {
+            'propertyType': property_data['property_type'],
+            'Location': property_data['location'],
+            'Bedroom': property_data['bedrooms'],
+            'bathroom': property_data['bathrooms'],
+            'House size': medians['House size'] if house_size is None else house_size,
+            'Land size': medians['Land size'] if land_size is None else land_size,
+        }
+        
+        # Engineer features
+        data = self.engineer_features(data)
+        
+        # Encode categorical variables
+        try:
+            data['propertyType'] = self._property_codes[data['propertyType']]
+            data['Location'] = self._location_codes[data['Location']]
+        except KeyError as e:
+            logger.error(f"Encoding error: unseen label {str(e)}")
+            raise PredictionError(f"Invalid property type or location: {str(e)}")
         
         return data
     
@@ -67,51 +265,42 @@ class PropertyPricePredictor:
                 - land_size: float (optional)
         
         Returns:
-            pandas DataFrame ready for prediction
+            numpy array of shape (1, n_features) ready for prediction
         """
-        # Map input to feature format
-        data = {
-            'propertyType': property_data['property_type'],
-            'Location': property_data['location'],
-            'Bedroom': property_data['bedrooms'],
-            'bathroom': property_data['bathrooms'],
-            'House size': property_data.get('house_size', self.stats['median_values']['House size']),
-            'Land size': property_data.get('land_size', self.stats['median_values']['Land size'])
-        }
-        
-        # Engineer features
-        data = self.engineer_features(data)
+        return self.prepare_input_batch([property_data])
+    
+    def prepare_input_batch(self, properties):
+        """
+        Prepare several inputs for prediction
         
-        # Create DataFrame with all required features
-        df = pd.DataFrame([data])
+        Args:
+            properties: list of property_data dicts (see prepare_input)
         
-        # Encode categorical variables
-        try:
-            df['propertyType'] = self.le_property.transform([data['propertyType']])[0]
-            df['Location'] = self.le_location.transform([data['Location']])[0]
-        except ValueError as e:
-            logger.error(f"Encoding error: {str(e)}")
-            raise ValueError(f"Invalid property type or location: {str(e)}")
+        Returns:
+            numpy array of shape (n_properties, n_features)
+        """
+        X = np.empty((len(properties), len(self.feature_names)), dtype=np.float32)
         
-        # Ensure all features are present in correct order
-        df = df[self.feature_names]
+        # Fill features in the order the models were trained on
+        for row, property_data in enumerate(properties):
+            data = self._feature_row(property_data)
+            for name, i in self._feat_index.items():
+                X[row, i] = data[name]
         
-        return df
+        return X
     
-    def ensemble_predict(self, X):
-        """Make ensemble prediction"""
-        scaler = self.models['scaler']
-        X_scaled = scaler.transform(X)
+    def component_predict(self, X):
+        """
+        Get individual model predictions for prepared rows
         
-        # Get predictions from all models
-        rf_pred = self.models['rf'].predict(X)
+        Returns:
+            tuple of (tree_preds, gb_pred, ridge_pred) where tree_preds is
+            (n_rows, n_trees) and the others have one entry per row
+        """
+        tree_preds = self.tree_predict(X)
         gb_pred = self.models['gb'].predict(X)
-        ridge_pred = self.models['ridge'].predict(X_scaled)
-        
-        # Weighted ensemble (RF: 50%, GB: 30%, Ridge: 20%)
-        ensemble_pred = 0.5 * rf_pred + 0.3 * gb_pred + 0.2 * ridge_pred
-        
-        return ensemble_pred[0]
+        ridge_pred = ((X - self._scaler_mean) * self._scaler_invscale) @ self._ridge_w + self._ridge_b
+        return tree_preds, gb_pred, ridge_pred
     
     def predict_with_confidence(self, property_data):
         """
@@ -124,55 +313,45 @@ class PropertyPricePredictor:
                 - price_range_min: float
                 - price_range_max: float
                 - feature_importance: dict
+                - model_metrics: dict
+            
+            feature_importance and model_metrics are shared across calls
+            and must be treated as read-only.
+        """
+        return self.predict_batch([property_data])[0]
+    
+    def predict_batch(self, properties):
+        """
+        Make predictions with confidence intervals for several properties,
+        calling each model once on the stacked inputs
+        
+        Returns:
+            list of result dicts in input order (see predict_with_confidence)
         """
+        if not properties:
+            return []
+        
         try:
             # Prepare input
-            X = self.prepare_input(property_data)
-            
-            # Get ensemble prediction
-            predicted_price = self.ensemble_predict(X)
-            
-            # Get predictions from individual models for confidence calculation
-            rf_pred = self.models['rf'].predict(X)[0]
-            gb_pred = self.models['gb'].predict(X)[0]
-            
-            # Calculate confidence based on model agreement
-            predictions = [rf_pred, gb_pred, predicted_price]
-            std_dev = np.std(predictions)
-            mean_pred = np.mean(predictions)
-            
-            # Confidence score (inverse of coefficient of variation)
-            cv = std_dev / mean_pred if mean_pred > 0 else 1
-            confidence_score = max(0, min(1, 1 - cv))
+            X = self.prepare_input_batch(properties)
             
-            # Calculate prediction interval (using RF's std from estimators)
-            tree_predictions = np.array([
-                tree.predict(X)[0] for tree in self.models['rf'].estimators_
-            ])
-            std_error = np.std(tree_predictions)
-            
-            # 95% confidence interval
-            margin = 1.96 * std_error
-            price_range_min = max(0, predicted_price - margin)
-            price_range_max = predicted_price + margin
-            
-            # Get feature importance
-            feature_importance = {
-                name: float(importance) 
-                for name, importance in zip(
-                    self.feature_names, 
-                    self.models['rf'].feature_importances_
-                )
-            }
+            # Get individual model predictions and combine them in one compiled pass
+            tree_predictions, gb_pred, ridge_pred = self.component_predict(X)
+            predicted_price, confidence_score, price_range_min, price_range_max = _finalize(
+                tree_predictions, gb_pred, ridge_pred
+            )
             
-            return {
-                'predicted_price': float(predicted_price),
-                'confidence_score': float(confidence_score),
-                'price_range_min': float(price_range_min),
-                'price_range_max': float(price_range_max),
-                'feature_importance': feature_importance,
-                'model_metrics': self.stats['metrics']
-            }
+            return [
+                {
+                    'predicted_price': float(predicted_price[i]),
+                    'confidence_score': float(confidence_score[i]),
+                    'price_range_min': float(price_range_min[i]),
+                    'price_range_max': float(price_range_max[i]),
+                    'feature_importance': self._feature_importance,
+                    'model_metrics': self.metrics
+                }
+                for i in range(len(properties))
+            ]
             
         except Exception as e:
             logger.error(f"Prediction error: {str(e)}")
@@ -228,5 +407,32 @@ class PropertyPricePredictor:
         
         return explanations
 
-# Create singleton instance
-predictor = PropertyPricePredictor()
\ No newline at end of file
+# Shared instance, created on first use rather than at import
+_instance = None
+_lock = threading.Lock()
+
+def get_predictor():
+    """Return the shared predictor, loading the models on first call"""
+    global _instance
+    if _instance is None:
+        with _lock:
+            if _instance is None:
+                _instance = PropertyPricePredictor()
+    return _instance
+
+# Cache key for the active ModelMetrics row
+ACTIVE_METRICS_CACHE_KEY = 'active_model_metrics'
+
+def get_active_metrics():
+    """
+    Return the active ModelMetrics row (or None), cached for DEFAULT_CACHE_TIMEOUT.
+    Deleted by signal handlers when ModelMetrics rows are saved; the TTL covers
+    queryset.update() and writes from other processes.
+    """
+    metrics = cache.get(ACTIVE_METRICS_CACHE_KEY)
+    if metrics is None:
+        metrics = ModelMetrics.objects.filter(is_active=True).first()
+        # Don't cache a missing row, so metrics show up as soon as they're created
+        if metrics is not None:
+            cache.set(ACTIVE_METRICS_CACHE_KEY, metrics, settings.DEFAULT_CACHE_TIMEOUT)
+    return metrics
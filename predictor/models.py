@@ -79,9 +79,7 @@ class PredictionRequest(models.Model):
     )
     
     # Prediction results
-    predicted_price = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
+    predicted_price = models.FloatField(
         null=True,
         blank=True,
         help_text="Predicted price in KSh"
@@ -92,16 +90,12 @@ class PredictionRequest(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(1)],
         help_text="Model confidence score (0-1)"
     )
-    price_range_min = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
+    price_range_min = models.FloatField(
         null=True,
         blank=True,
         help_text="Minimum predicted price"
     )
-    price_range_max = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
+    price_range_max = models.FloatField(
         null=True,
         blank=True,
         help_text="Maximum predicted price"
@@ -116,9 +110,16 @@ class PredictionRequest(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['-created_at']),
-            models.Index(fields=['location']),
-            models.Index(fields=['property_type']),
+            models.Index(fields=['-created_at'], name='recent_idx'),
+            # Cover the per-type/per-location GROUP BY with Avg('predicted_price');
+            # also serve plain property_type/location lookups as prefixes
+            models.Index(fields=['property_type', 'predicted_price'], name='pt_price_idx'),
+            models.Index(fields=['location', 'predicted_price'], name='loc_price_idx'),
+            # Matches the admin's location/property_type filters sorted by -created_at
+            models.Index(
+                fields=['location', 'property_type', '-created_at'],
+                name='pr_loc_ptype_created_idx'
+            ),
         ]
     
     def __str__(self):
@@ -156,9 +157,7 @@ class UserFeedback(models.Model):
         help_text="Rating from 1-5 stars"
     )
     comment = models.TextField(blank=True, help_text="Optional feedback comment")
-    actual_price = models.DecimalField(
-        max_digits=15,
-        decimal_places=2,
+    actual_price = models.FloatField(
         null=True,
         blank=True,
         help_text="Actual price if known"
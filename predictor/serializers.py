@@ -3,16 +3,16 @@ REST Framework serializers for property prediction
 """
 
 from rest_framework import serializers
-from .models import PredictionRequest, UserFeedback, ModelMetrics
+from .models import PredictionRequest, UserFeedback, ModelMetrics, PropertyType, Location
+
+# Static enum choices, resolved once per process
+PROPERTY_TYPES = PropertyType.choices
+LOCATIONS = Location.choices
 
 class PredictionInputSerializer(serializers.Serializer):
     """Serializer for prediction input validation"""
-    property_type = serializers.ChoiceField(
-        choices=PredictionRequest._meta.get_field('property_type').choices
-    )
-    location = serializers.ChoiceField(
-        choices=PredictionRequest._meta.get_field('location').choices
-    )
+    property_type = serializers.ChoiceField(choices=PROPERTY_TYPES)
+    location = serializers.ChoiceField(choices=LOCATIONS)
     bedrooms = serializers.IntegerField(min_value=1, max_value=20)
     bathrooms = serializers.IntegerField(min_value=1, max_value=20)
     house_size = serializers.FloatField(
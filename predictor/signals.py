@@ -0,0 +1,37 @@
+"""
+Signal handlers for property price prediction
+"""
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .ml_utils import ACTIVE_METRICS_CACHE_KEY
+from .models import PredictionRequest, ModelMetrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cache key for the landing page aggregates
+HOME_STATS_CACHE_KEY = 'home_stats'
+
+# Cache key for the dashboard context; expires by TTL only
+DASHBOARD_CACHE_KEY = 'dashboard_ctx'
+
+def _delete_cached(key):
+    """Delete a cache key, logging instead of failing the write that triggered it"""
+    # Backend errors vary (redis ConnectionError, missing redis package, ...);
+    # a stale entry only lives until its TTL
+    try:
+        cache.delete(key)
+    except Exception:
+        logger.exception("Cache invalidation failed for %s", key)
+
+@receiver([post_save, post_delete], sender=PredictionRequest)
+def invalidate_prediction_stats(sender, **kwargs):
+    """Drop cached prediction aggregates so they refresh on next request"""
+    _delete_cached(HOME_STATS_CACHE_KEY)
+
+@receiver([post_save, post_delete], sender=ModelMetrics)
+def invalidate_active_metrics(sender, **kwargs):
+    """Forget the cached active model metrics"""
+    _delete_cached(ACTIVE_METRICS_CACHE_KEY)
@@ -0,0 +1,64 @@
+"""
+Celery tasks for property price prediction
+"""
+
+from celery import shared_task
+from .ml_utils import get_predictor
+from .models import PredictionRequest
+from .signals import invalidate_prediction_stats
+
+def _prediction_row(property_data, result, ip_address, session_id):
+    """Build an unsaved PredictionRequest for a served prediction"""
+    return PredictionRequest(
+        property_type=property_data['property_type'],
+        location=property_data['location'],
+        bedrooms=property_data['bedrooms'],
+        bathrooms=property_data['bathrooms'],
+        house_size=property_data.get('house_size'),
+        land_size=property_data.get('land_size'),
+        predicted_price=result['predicted_price'],
+        confidence_score=result['confidence_score'],
+        price_range_min=result['price_range_min'],
+        price_range_max=result['price_range_max'],
+        ip_address=ip_address,
+        session_id=session_id,
+    )
+
+@shared_task(bind=True)
+def batch_predict_task(self, batch, ip_address=None, session_id=None):
+    """
+    Predict prices for a batch of validated property inputs and store them
+    
+    Args:
+        batch: list of property_data dicts (see PropertyPricePredictor.prepare_input)
+        ip_address: client IP recorded on the stored predictions
+        session_id: client session key recorded on the stored predictions
+    
+    Returns:
+        list of dicts with input, prediction and confidence
+    """
+    self.update_state(state='PROGRESS', meta={'total': len(batch)})
+    
+    # One vectorized call for the whole batch
+    results = get_predictor().predict_batch(batch)
+    
+    # One INSERT per 500 rows instead of one per prediction
+    PredictionRequest.objects.bulk_create(
+        [
+            _prediction_row(property_data, result, ip_address, session_id)
+            for property_data, result in zip(batch, results)
+        ],
+        batch_size=500
+    )
+    # bulk_create doesn't send post_save
+    invalidate_prediction_stats(sender=PredictionRequest)
+    
+    return [
+        {
+            'input': property_data,
+            'prediction': result['predicted_price'],
+            'confidence': result['confidence_score'],
+        }
+        for property_data, result in zip(batch, results)
+    ]
+
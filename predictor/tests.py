@@ -1,3 +1,147 @@
-from django.test import TestCase
+from django.test import TestCase, RequestFactory, override_settings
+from rest_framework.test import APIRequestFactory
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from unittest import mock
+from pathlib import Path
+from .ml_utils import PropertyPricePredictor
+from .models import PredictionRequest, UserFeedback, PropertyType, Location
+from .views import history_view, PredictionViewSet
+import joblib
+import numpy as np
+import tempfile
 
-# Create your tests here.
+FEATURE_NAMES = [
+    'propertyType', 'Location', 'Bedroom', 'bathroom', 'House size', 'Land size',
+    'bath_bed_ratio', 'total_area', 'location_premium', 'property_premium',
+]
+MEDIAN_SIZES = {'House size': 200.0, 'Land size': 500.0}
+
+def train_models(model_dir):
+    """Fit tiny models on random data and save them the way load_models expects"""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, (200, len(FEATURE_NAMES)))
+    y = rng.uniform(1e6, 5e7, 200)
+    scaler = StandardScaler().fit(X)
+    joblib.dump({
+        'rf': RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y),
+        'gb': GradientBoostingRegressor(n_estimators=5, random_state=0).fit(X, y),
+        'ridge': Ridge().fit(scaler.transform(X), y),
+        'scaler': scaler,
+    }, model_dir / 'property_models.pkl')
+    joblib.dump(LabelEncoder().fit(PropertyType.values), model_dir / 'property_type_encoder.pkl')
+    joblib.dump(LabelEncoder().fit(Location.values), model_dir / 'location_encoder.pkl')
+    joblib.dump(FEATURE_NAMES, model_dir / 'feature_names.pkl')
+    joblib.dump({
+        'median_values': MEDIAN_SIZES,
+        'metrics': {'mae': 1.0, 'rmse': 1.0, 'r2_score': 0.5, 'mape': 1.0},
+    }, model_dir / 'model_stats.pkl')
+
+HISTORY_TEMPLATE = (
+    '{% for p in predictions %}'
+    '{{ p.property_type }} {{ p.location }} {{ p.price_formatted }} '
+    '{{ p.confidence_score }} {{ p.created_at }} {{ p.feedback.all|length }}'
+    '{% endfor %}'
+)
+
+@override_settings(TEMPLATES=[{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {
+        'loaders': [
+            ('django.template.loaders.locmem.Loader', {
+                'predictor/history.html': HISTORY_TEMPLATE,
+            }),
+        ],
+    },
+}])
+class HistoryViewQueryTests(TestCase):
+    """History page query count must not grow with the number of rows"""
+    
+    def setUp(self):
+        for i in range(5):
+            prediction = PredictionRequest.objects.create(
+                property_type='Apartment',
+                location='Karen',
+                bedrooms=3,
+                bathrooms=2,
+                predicted_price=10000000 + i,
+                confidence_score=0.9,
+            )
+            UserFeedback.objects.create(prediction=prediction, rating=4)
+    
+    def test_history_query_count(self):
+        request = RequestFactory().get('/history/')
+        # One query for predictions, one for their prefetched feedback
+        with self.assertNumQueries(2):
+            response = history_view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'KSh 10,000,004', response.content)
+
+
+class PredictMissingSizeTests(TestCase):
+    """Sizes are optional inputs and fall back to the training medians"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model_dir = tempfile.TemporaryDirectory()
+        train_models(Path(cls.model_dir.name))
+        with override_settings(ML_MODEL_DIR=Path(cls.model_dir.name)):
+            cls.predictor = PropertyPricePredictor()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.model_dir.cleanup()
+        super().tearDownClass()
+    
+    def test_predict_without_sizes(self):
+        property_data = {
+            'property_type': 'Apartment',
+            'location': 'Karen',
+            'bedrooms': 3,
+            'bathrooms': 2,
+        }
+        request = APIRequestFactory().post('/api/predictions/predict/', property_data, format='json')
+        view = PredictionViewSet.as_view({'post': 'predict'})
+        with mock.patch('predictor.views.get_predictor', return_value=self.predictor):
+            response = view(request)
+        
+        self.assertEqual(response.status_code, 200)
+        expected = self.predictor.predict_with_confidence({
+            **property_data,
+            'house_size': MEDIAN_SIZES['House size'],
+            'land_size': MEDIAN_SIZES['Land size'],
+        })
+        self.assertEqual(response.data['predicted_price'], expected['predicted_price'])
+        self.assertTrue(PredictionRequest.objects.filter(pk=response.data['prediction_id']).exists())
+
+class ForestKernelTests(TestCase):
+    """The flattened numba forest walk must match sklearn's trees"""
+    
+    def test_tree_predictions_match_sklearn(self):
+        rng = np.random.default_rng(0)
+        X_train = rng.uniform(0, 100, (300, 4))
+        y_train = X_train @ [3.0, -2.0, 0.5, 1.0] + rng.normal(0, 5, 300)
+        rf = RandomForestRegressor(n_estimators=4, max_depth=5, random_state=0).fit(X_train, y_train)
+        
+        predictor = PropertyPricePredictor.__new__(PropertyPricePredictor)
+        predictor.models = {'rf': rf}
+        predictor._extract_forest()
+        
+        # Random rows, plus rows sitting exactly on (and one float32 step either
+        # side of) every split threshold of every tree
+        rows = [rng.uniform(0, 100, 4) for _ in range(50)]
+        for est in rf.estimators_:
+            tree = est.tree_
+            for node in np.flatnonzero(tree.children_left != -1):
+                at = np.float32(tree.threshold[node])
+                for value in (np.nextafter(at, np.float32(-np.inf)), at,
+                              np.nextafter(at, np.float32(np.inf))):
+                    row = rng.uniform(0, 100, 4)
+                    row[tree.feature[node]] = value
+                    rows.append(row)
+        X = np.array(rows, dtype=np.float32)
+        
+        expected = np.column_stack([est.predict(X) for est in rf.estimators_])
+        np.testing.assert_allclose(predictor.tree_predict(X), expected, rtol=1e-6)
@@ -27,4 +27,5 @@ urlpatterns = [
     path('', include(router.urls)),
     path('model-info/', views.model_info, name='model-info'),
     path('batch-predict/', views.batch_predict, name='batch-predict'),
+    path('batch-predict/<str:job_id>/status/', views.batch_predict_status, name='batch-predict-status'),
 ]
@@ -2,50 +2,157 @@
 Django views for property price prediction
 """
 
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
 from django.http import JsonResponse
+from django.views.decorators.cache import cache_page
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
+from django.db import DatabaseError, connection
 from django.db.models import Avg, Count, Q
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
-from .models import PredictionRequest, UserFeedback, ModelMetrics
+from celery.result import AsyncResult
+from kombu.exceptions import OperationalError
+from .models import PredictionRequest, UserFeedback
 from .serializers import (
     PredictionRequestSerializer, 
     UserFeedbackSerializer,
     PredictionInputSerializer
 )
-from .ml_utils import predictor
+from .ml_utils import get_predictor, get_active_metrics, PredictionError
+from .signals import HOME_STATS_CACHE_KEY, DASHBOARD_CACHE_KEY
+from .tasks import batch_predict_task
+import hashlib
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
+# Static enum choices, computed once at import
+_PROPERTY_TYPE_CHOICES = dict(PredictionRequest._meta.get_field('property_type').choices)
+_LOCATION_CHOICES = dict(PredictionRequest._meta.get_field('location').choices)
+_PROPERTY_TYPE_KEYS = list(_PROPERTY_TYPE_CHOICES)
+_LOCATION_KEYS = list(_LOCATION_CHOICES)
+
+def get_client_ip(request):
+    """Get client IP address"""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip = x_forwarded_for.split(',')[0]
+    else:
+        ip = request.META.get('REMOTE_ADDR')
+    return ip
+
+def get_session_key(request):
+    """Get the client's existing session key without creating a session"""
+    session = getattr(request, 'session', None)
+    return getattr(session, 'session_key', None)
+
+def approx_count(model):
+    """
+    Row count for display, read from pg_class.reltuples when USE_APPROX_COUNT
+    is enabled on PostgreSQL; falls back to an exact count() otherwise.
+    """
+    if settings.USE_APPROX_COUNT and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed or analyzed
+        if row and row[0] >= 0:
+            return row[0]
+    return model.objects.count()
+
+def _property_data(validated_data):
+    """Map validated PredictionInputSerializer data to predictor input"""
+    return {
+        'property_type': validated_data['property_type'],
+        'location': validated_data['location'],
+        'bedrooms': validated_data['bedrooms'],
+        'bathrooms': validated_data['bathrooms'],
+        'house_size': validated_data.get('house_size'),
+        'land_size': validated_data.get('land_size'),
+    }
+
+def _ksh(amount):
+    """Format a price as KSh with thousands separators, rounded to whole shillings"""
+    # round() gives an int, whose formatting skips the float-to-decimal path
+    return f"KSh {round(amount):,}"
+
+# Prediction cache: keys round sizes to this many m² to raise the hit rate
+PREDICTION_CACHE_TIMEOUT = 3600
+SIZE_BUCKET = 10
+
+def _bucket_sizes(property_data):
+    """Round house/land size to the nearest SIZE_BUCKET m²"""
+    data = dict(property_data)
+    for key in ('house_size', 'land_size'):
+        if data.get(key) is not None:
+            data[key] = float(round(data[key] / SIZE_BUCKET) * SIZE_BUCKET)
+    return data
+
+def _prediction_cache_key(model_hash, property_data):
+    """Cache key for a prediction input, scoped to the models that serve it"""
+    digest = hashlib.blake2b(
+        json.dumps(property_data, sort_keys=True).encode(),
+        digest_size=16
+    ).hexdigest()
+    return f'pred:{model_hash}:{digest}'
+
+def _model_etag(request):
+    """ETag for model_info, changing whenever a new model is activated"""
+    try:
+        metrics = get_active_metrics()
+    except DatabaseError:
+        return None
+    if metrics is None:
+        return None
+    return hashlib.blake2b(
+        f'{metrics.model_version}:{metrics.training_date.isoformat()}'.encode(),
+        digest_size=16
+    ).hexdigest()
+
 # Template Views
 def home_view(request):
     """Main landing page"""
-    context = {
-        'property_types': dict(PredictionRequest._meta.get_field('property_type').choices),
-        'locations': dict(PredictionRequest._meta.get_field('location').choices),
-        'total_predictions': PredictionRequest.objects.count(),
+    # Aggregates are invalidated by signal handlers when predictions change
+    stats = cache.get_or_set(HOME_STATS_CACHE_KEY, lambda: {
+        'total_predictions': approx_count(PredictionRequest),
         'avg_price': PredictionRequest.objects.aggregate(Avg('predicted_price'))['predicted_price__avg'],
+    }, timeout=settings.DEFAULT_CACHE_TIMEOUT)
+    
+    context = {
+        'property_types': _PROPERTY_TYPE_CHOICES,
+        'locations': _LOCATION_CHOICES,
+        **stats,
     }
     return render(request, 'predictor/home.html', context)
 
+@cache_page(settings.DEFAULT_CACHE_TIMEOUT)
 def predict_view(request):
     """Prediction form page"""
-    from .models import PropertyType, Location
     context = {
-        'property_types': PropertyType.choices,
-        'locations': Location.choices,
+        'property_types': _PROPERTY_TYPE_CHOICES.items(),
+        'locations': _LOCATION_CHOICES.items(),
     }
     return render(request, 'predictor/predict.html', context)
 
-def dashboard_view(request):
-    """Analytics dashboard"""
-    # Get statistics
-    total_predictions = PredictionRequest.objects.count()
+# Dashboards tolerate a minute of staleness
+DASHBOARD_CACHE_TIMEOUT = 60
+
+def _dashboard_context():
+    """Build the dashboard context (cached by dashboard_view)"""
+    # Scalar stats in a single query
+    totals = PredictionRequest.objects.aggregate(
+        total=Count('id'),
+        avg_price=Avg('predicted_price')
+    )
     
     # Property type distribution
     property_dist = PredictionRequest.objects.values('property_type').annotate(
@@ -59,43 +166,58 @@ def dashboard_view(request):
     ).order_by('-avg_price')[:10]
     
     # Recent predictions
-    recent = PredictionRequest.objects.all()[:10]
-    
-    # Model metrics
-    try:
-        latest_metrics = ModelMetrics.objects.filter(is_active=True).first()
-    except:
-        latest_metrics = None
+    recent = PredictionRequest.objects.prefetch_related('feedback').only(
+        'id', 'property_type', 'location', 'predicted_price', 'created_at'
+    )[:10]
     
-    context = {
-        'total_predictions': total_predictions,
+    return {
+        'total_predictions': totals['total'],
+        'avg_price': totals['avg_price'],
         'property_dist': list(property_dist),
         'location_dist': list(location_dist),
-        'recent_predictions': recent,
-        'model_metrics': latest_metrics,
+        'recent_predictions': list(recent),
+        'model_metrics': get_active_metrics(),
     }
+
+def dashboard_view(request):
+    """Analytics dashboard"""
+    context = cache.get_or_set(
+        DASHBOARD_CACHE_KEY, _dashboard_context, timeout=DASHBOARD_CACHE_TIMEOUT
+    )
     return render(request, 'predictor/dashboard.html', context)
 
 def history_view(request):
     """Prediction history page"""
-    predictions = PredictionRequest.objects.all()[:50]
+    # Prefetch feedback in one query and skip columns the page doesn't show
+    predictions = PredictionRequest.objects.prefetch_related('feedback').only(
+        'id', 'property_type', 'location', 'predicted_price',
+        'confidence_score', 'created_at'
+    )[:50]
     context = {'predictions': predictions}
     return render(request, 'predictor/history.html', context)
 
 # API Views
+
+# Flat columns returned by the predictions list endpoint
+PREDICTION_LIST_FIELDS = (
+    'id', 'property_type', 'location', 'bedrooms', 'bathrooms',
+    'house_size', 'land_size', 'predicted_price', 'confidence_score',
+    'price_range_min', 'price_range_max', 'created_at',
+)
+
 class PredictionViewSet(viewsets.ModelViewSet):
     """ViewSet for prediction requests"""
     queryset = PredictionRequest.objects.all()
     serializer_class = PredictionRequestSerializer
     
+    def list(self, request, *args, **kwargs):
+        """List predictions as plain values() rows, skipping DRF serializer work"""
+        rows = self.filter_queryset(self.get_queryset()).values(*PREDICTION_LIST_FIELDS)
+        return Response(list(rows))
+    
     def get_client_ip(self, request):
         """Get client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_client_ip(request)
     
     @action(detail=False, methods=['post'])
     def predict(self, request):
@@ -110,22 +232,23 @@ class PredictionViewSet(viewsets.ModelViewSet):
                 )
             
             # Prepare data for prediction
-            property_data = {
-                'property_type': serializer.validated_data['property_type'],
-                'location': serializer.validated_data['location'],
-                'bedrooms': serializer.validated_data['bedrooms'],
-                'bathrooms': serializer.validated_data['bathrooms'],
-                'house_size': serializer.validated_data.get('house_size'),
-                'land_size': serializer.validated_data.get('land_size'),
-            }
+            property_data = _property_data(serializer.validated_data)
             
-            # Make prediction
-            result = predictor.predict_with_confidence(property_data)
+            # Make prediction, reusing the cached result for inputs in the same
+            # size bucket; the model itself always sees exact sizes
+            predictor = get_predictor()
+            result = cache.get_or_set(
+                _prediction_cache_key(predictor.model_hash, _bucket_sizes(property_data)),
+                lambda: predictor.predict_with_confidence(property_data),
+                PREDICTION_CACHE_TIMEOUT
+            )
             
-            # Get explanation
+            # Get explanation for the sizes the user entered
             explanations = predictor.explain_prediction(property_data, result)
             
-            # Save prediction to database
+            # Save prediction to database. This stays on the request path:
+            # clients post feedback against prediction_id (a required foreign
+            # key on UserFeedback), so the row must exist before we respond
             prediction_obj = PredictionRequest.objects.create(
                 property_type=property_data['property_type'],
                 location=property_data['location'],
@@ -138,21 +261,21 @@ class PredictionViewSet(viewsets.ModelViewSet):
                 price_range_min=result['price_range_min'],
                 price_range_max=result['price_range_max'],
                 ip_address=self.get_client_ip(request),
-                session_id=request.session.session_key,
+                session_id=get_session_key(request),
             )
             
             # Prepare response
             response_data = {
                 'prediction_id': prediction_obj.id,
                 'predicted_price': result['predicted_price'],
-                'predicted_price_formatted': f"KSh {result['predicted_price']:,.0f}",
+                'predicted_price_formatted': _ksh(result['predicted_price']),
                 'confidence_score': result['confidence_score'],
                 'confidence_percentage': f"{result['confidence_score'] * 100:.1f}%",
                 'price_range': {
                     'min': result['price_range_min'],
                     'max': result['price_range_max'],
-                    'min_formatted': f"KSh {result['price_range_min']:,.0f}",
-                    'max_formatted': f"KSh {result['price_range_max']:,.0f}",
+                    'min_formatted': _ksh(result['price_range_min']),
+                    'max_formatted': _ksh(result['price_range_max']),
                 },
                 'explanations': explanations,
                 'model_metrics': result['model_metrics'],
@@ -161,22 +284,30 @@ class PredictionViewSet(viewsets.ModelViewSet):
             
             return Response(response_data, status=status.HTTP_200_OK)
             
-        except Exception as e:
-            logger.error(f"Prediction error: {str(e)}")
+        except PredictionError as e:
+            logger.exception("Prediction error")
             return Response(
                 {'error': 'Prediction failed', 'details': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        except DatabaseError:
+            logger.exception("Prediction save error")
+            return Response(
+                {'error': 'Failed to save prediction'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get prediction statistics"""
         try:
+            totals = PredictionRequest.objects.aggregate(
+                total=Count('id'),
+                avg_price=Avg('predicted_price')
+            )
             stats = {
-                'total_predictions': PredictionRequest.objects.count(),
-                'avg_price': PredictionRequest.objects.aggregate(
-                    Avg('predicted_price')
-                )['predicted_price__avg'],
+                'total_predictions': totals['total'],
+                'avg_price': totals['avg_price'],
                 'by_property_type': list(
                     PredictionRequest.objects.values('property_type').annotate(
                         count=Count('id'),
@@ -189,13 +320,16 @@ class PredictionViewSet(viewsets.ModelViewSet):
                         avg_price=Avg('predicted_price')
                     ).order_by('-avg_price')[:10]
                 ),
-                'recent_predictions': PredictionRequestSerializer(
-                    PredictionRequest.objects.all()[:10], many=True
-                ).data,
+                'recent_predictions': list(
+                    PredictionRequest.objects.values(
+                        'id', 'property_type', 'location',
+                        'predicted_price', 'confidence_score', 'created_at'
+                    )[:10]
+                ),
             }
             return Response(stats, status=status.HTTP_200_OK)
-        except Exception as e:
-            logger.error(f"Statistics error: {str(e)}")
+        except DatabaseError:
+            logger.exception("Statistics error")
             return Response(
                 {'error': 'Failed to fetch statistics'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -203,7 +337,7 @@ class PredictionViewSet(viewsets.ModelViewSet):
 
 class FeedbackViewSet(viewsets.ModelViewSet):
     """ViewSet for user feedback"""
-    queryset = UserFeedback.objects.all()
+    queryset = UserFeedback.objects.select_related('prediction')
     serializer_class = UserFeedbackSerializer
     
     def create(self, request, *args, **kwargs):
@@ -217,18 +351,20 @@ class FeedbackViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_201_CREATED
                 )
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            logger.error(f"Feedback error: {str(e)}")
+        except DatabaseError:
+            logger.exception("Feedback error")
             return Response(
                 {'error': 'Failed to submit feedback'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
 @api_view(['GET'])
+@condition(etag_func=_model_etag)
 def model_info(request):
     """Get information about the ML model"""
     try:
-        metrics = ModelMetrics.objects.filter(is_active=True).first()
+        metrics = get_active_metrics()
+        predictor = get_predictor()
         
         info = {
             'model_version': metrics.model_version if metrics else 'v1.0',
@@ -237,16 +373,17 @@ def model_info(request):
                 'rmse': metrics.rmse if metrics else None,
                 'r2_score': metrics.r2_score if metrics else None,
                 'mape': metrics.mape if metrics else None,
-            } if metrics else predictor.stats.get('metrics', {}),
+            } if metrics else predictor.metrics,
             'training_date': metrics.training_date if metrics else None,
-            'feature_importance': predictor.stats.get('feature_importance', {}),
-            'supported_property_types': [choice[0] for choice in PredictionRequest._meta.get_field('property_type').choices],
-            'supported_locations': [choice[0] for choice in PredictionRequest._meta.get_field('location').choices],
+            'feature_importance': predictor.feature_importance,
+            'supported_property_types': _PROPERTY_TYPE_KEYS,
+            'supported_locations': _LOCATION_KEYS,
         }
         
         return Response(info, status=status.HTTP_200_OK)
-    except Exception as e:
-        logger.error(f"Model info error: {str(e)}")
+    except (DatabaseError, OSError):
+        # OSError covers missing or unreadable model files
+        logger.exception("Model info error")
         return Response(
             {'error': 'Failed to fetch model info'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -256,32 +393,52 @@ def model_info(request):
 def batch_predict(request):
     """Make multiple predictions at once"""
     try:
-        predictions_data = request.data.get('predictions', [])
-        results = []
+        # Validate every row in one pass, reporting all errors together
+        serializer = PredictionInputSerializer(
+            data=request.data.get('predictions', []), many=True, allow_empty=False
+        )
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Invalid input', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        batch = [_property_data(data) for data in serializer.validated_data]
         
-        for prop_data in predictions_data:
-            serializer = PredictionInputSerializer(data=prop_data)
-            if serializer.is_valid():
-                property_data = {
-                    'property_type': serializer.validated_data['property_type'],
-                    'location': serializer.validated_data['location'],
-                    'bedrooms': serializer.validated_data['bedrooms'],
-                    'bathrooms': serializer.validated_data['bathrooms'],
-                    'house_size': serializer.validated_data.get('house_size'),
-                    'land_size': serializer.validated_data.get('land_size'),
-                }
-                
-                result = predictor.predict_with_confidence(property_data)
-                results.append({
-                    'input': property_data,
-                    'prediction': result['predicted_price'],
-                    'confidence': result['confidence_score'],
-                })
+        # Predict and store all valid rows in one vectorized call off the request thread
+        job = batch_predict_task.delay(
+            batch,
+            ip_address=get_client_ip(request),
+            session_id=get_session_key(request),
+        )
         
-        return Response({'results': results}, status=status.HTTP_200_OK)
-    except Exception as e:
-        logger.error(f"Batch prediction error: {str(e)}")
+        return Response(
+            {
+                'job_id': job.id,
+                'status_url': request.build_absolute_uri(
+                    reverse('predictor:batch-predict-status', args=[job.id])
+                ),
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+    except OperationalError:
+        # Broker unreachable
+        logger.exception("Batch prediction error")
         return Response(
             {'error': 'Batch prediction failed'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+@api_view(['GET'])
+def batch_predict_status(request, job_id):
+    """Get the state of a batch prediction job, with results once finished"""
+    job = AsyncResult(job_id)
+    data = {'job_id': job_id, 'status': job.state}
+    
+    if job.state == 'PROGRESS':
+        data['progress'] = job.info
+    elif job.successful():
+        data['results'] = job.result
+    elif job.failed():
+        data['error'] = 'Batch prediction failed'
+    
+    return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,17 @@
+"""
+Celery configuration for property_predictor project.
+
+Tasks are discovered from each installed app's ``tasks`` module. Broker and
+result backend settings are read from Django settings with the ``CELERY_``
+prefix.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'property_predictor.settings')
+
+app = Celery('property_predictor')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -164,6 +164,36 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000",
 ]
 
+# Cache settings
+# Set CACHE_URL (e.g. redis://localhost:6379/1) when running Celery workers so
+# invalidation after a write in one process (e.g. predictions stored by a task)
+# is seen by all of them; RedisCache requires the redis package. Without it
+# each process keeps its own LocMemCache and relies on the TTL.
+if os.environ.get('CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+DEFAULT_CACHE_TIMEOUT = 300  # 5 minutes
+
+# Use the planner's row estimate instead of COUNT(*) for display counts (PostgreSQL only)
+USE_APPROX_COUNT = os.environ.get('USE_APPROX_COUNT', 'False') == 'True'
+
+# Celery settings
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_RESULT_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+
 # ML Model settings
 ML_MODEL_DIR = BASE_DIR / 'predictor' / 'ml_models'
 